@@ -1,11 +1,9 @@
 import streamlit as st
 import pandas as pd
+import numpy as np
 import plotly.express as px
-import matplotlib.pyplot as plt
-import re
-from github import Github
+import plotly.graph_objects as go
 import io
-import tempfile
 
 # --- REPORTLAB IMPORTS ---
 from reportlab.lib import colors
@@ -15,15 +13,14 @@ from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
 from reportlab.lib.enums import TA_CENTER, TA_LEFT
 from reportlab.graphics.shapes import Drawing, Line, Polygon
 
+from core import *
+
 # --- CONFIGURATION & CONSTANTS ---
 st.set_page_config(page_title="Mahagenco Parli Ops", page_icon="⚡", layout="wide")
 
-OPS_FILE = 'stitched_staffing_data.csv'
-DEPT_FILE = 'departmental_staffing_data.csv'
-REPO_NAME = "Chinmay-Dev27/mahagenco-staffing-dashboard"
-
 VIEW_OPS = "PCR Shift Operation (Main Plant)"
 VIEW_DEPT = "Departmental Staff"
+PAGE_SIZE = 100
 
 # --- CUSTOM CSS ---
 st.markdown("""
@@ -50,58 +47,7 @@ st.markdown("""
 
 # --- SESSION STATE ---
 if 'admin_logged_in' not in st.session_state: st.session_state.admin_logged_in = False
-
-# --- DATA FUNCTIONS ---
-def update_github(df, filename):
-    try:
-        token = st.secrets["github"]["token"]
-        g = Github(token)
-        repo = g.get_repo(REPO_NAME)
-        try:
-            contents = repo.get_contents(filename)
-            repo.update_file(contents.path, f"Admin Update {filename}", df.to_csv(index=False), contents.sha)
-        except:
-            repo.create_file(filename, "Initial Commit", df.to_csv(index=False))
-        return True
-    except Exception as e:
-        st.error(f"GitHub Sync Error: {e}")
-        return False
-
-@st.cache_data(ttl=1) 
-def load_data(filename):
-    try:
-        df = pd.read_csv(filename)
-        if filename == OPS_FILE and 'Desk' not in df.columns: return pd.DataFrame()
-        if 'Status' not in df.columns: df['Status'] = 'Active'
-        if 'Action_Required' not in df.columns: df['Action_Required'] = ''
-        return df.fillna("")
-    except:
-        return pd.DataFrame()
-
-def save_local(df, filename):
-    df.to_csv(filename, index=False)
-    st.cache_data.clear()
-
-def format_staff_name(raw_name, desg=""):
-    if "VACANT" in str(raw_name): return "VACANT"
-    clean = re.sub(r'\s*\((Transferred|Trf|transferred)\)', '', str(raw_name), flags=re.IGNORECASE).strip()
-    if desg and str(desg).strip() and str(desg).lower() not in clean.lower():
-        clean = f"{clean} ({desg})"
-    elif not desg:
-        pattern = r'\s+(JE|AE|DY\.? ?EE|ADD\.? ?EE|AD\.? ?EE|EE)\b'
-        match = re.search(pattern, clean, flags=re.IGNORECASE)
-        if match: clean = f"{clean[:match.start()].strip()} ({match.group(1)})"
-    return clean
-
-def get_rank_level(desg):
-    d = str(desg).upper().replace('.', '').strip()
-    if 'EXECUTIVE' in d or 'EE' in d:
-        if 'ADD' in d or 'AD' in d: return 2
-        if 'DY' in d: return 3
-        if d == 'EE' or d == 'EXECUTIVE ENGINEER': return 1
-    if 'AE' in d or 'ASSISTANT' in d: return 4
-    if 'JE' in d or 'JUNIOR' in d: return 5
-    return 6
+report_sync_errors()
 
 # --- GRAPHIC HELPERS ---
 def draw_red_cross():
@@ -116,37 +62,6 @@ def draw_orange_flag():
     d.add(Polygon([2, 10, 9, 7, 2, 4], fillColor=colors.orange, strokeWidth=0))
     return d
 
-# --- UNIVERSAL METRICS HELPER ---
-def calculate_metrics(df):
-    if df.empty: return 0, 0, pd.Series()
-    staff_only = df[df['Staff_Name'].str.contains("VACANT", case=False) == False].copy()
-    staff_only['Staff_Name'] = staff_only['Staff_Name'].astype(str).str.strip()
-    staff_only['Status_Rank'] = staff_only['Status'].apply(lambda x: 2 if 'Transferred' in str(x) else 1)
-    staff_only = staff_only.sort_values(by=['Staff_Name', 'Status_Rank'], ascending=[True, False])
-    unique_staff = staff_only.drop_duplicates(subset=['Staff_Name'], keep='first')
-    transferred = len(unique_staff[unique_staff['Status'] == 'Transferred'])
-    vacant = len(df[df['Status'] == 'VACANCY'])
-    status_counts = unique_staff['Status'].value_counts()
-    if vacant > 0: status_counts['VACANCY'] = vacant
-    return vacant, transferred, status_counts
-
-def get_global_metrics(ops_df, dept_df, scope="Global"):
-    dfs = []
-    if not ops_df.empty and scope in ["Global", "Ops"]:
-        clean_ops = ops_df[ops_df['Desk'] != 'Shift In-Charge'][['Staff_Name', 'Status']].copy()
-        dfs.append(clean_ops)
-    if not dept_df.empty:
-        if scope == "Global":
-            dfs.append(dept_df[['Staff_Name', 'Status']])
-        elif scope == "Ops":
-            sic = dept_df[dept_df['Department'].str.contains('Shift In-Charge', na=False)][['Staff_Name', 'Status']]
-            dfs.append(sic)
-        elif scope == "Dept":
-            dfs.append(dept_df[['Staff_Name', 'Status']])
-    if not dfs: return 0, 0, pd.Series()
-    combined = pd.concat(dfs)
-    return calculate_metrics(combined)
-
 # --- PDF ENGINE ---
 def generate_combined_pdf(ops_df, dept_df, report_type="Summary"):
     buffer = io.BytesIO()
@@ -165,15 +80,14 @@ def generate_combined_pdf(ops_df, dept_df, report_type="Summary"):
 
         # 1. Top Section: Shift In-Charge Anomalies
         sic_df = dept_df[dept_df['Department'].str.contains('Shift In-Charge', na=False)]
-        sic_anomalies = sic_df[sic_df['Status'].isin(['VACANCY', 'Transferred'])] if not sic_df.empty else pd.DataFrame()
+        sic_anomalies = sic_df.loc[sic_df['Status'].isin(['VACANCY', 'Transferred']), ['Department', '_display', 'Status']] if not sic_df.empty else pd.DataFrame()
         
         if not sic_anomalies.empty:
             story.append(Paragraph("⚠️ Shift In-Charge (Attention Required)", heading_style))
             sic_data = [['Unit', 'Name', 'Status']]
-            for _, r in sic_anomalies.iterrows():
-                unit = "Unit 6 & 7" if "U6&7" in r['Department'] else "Unit 8"
-                nm = format_staff_name(r['Staff_Name'])
-                st_txt = "TRANSFERRED" if r['Status'] == 'Transferred' else "VACANT"
+            for dept, nm, status in zip(sic_anomalies['Department'], sic_anomalies['_display'], sic_anomalies['Status']):
+                unit = "Unit 6 & 7" if "U6&7" in dept else "Unit 8"
+                st_txt = "TRANSFERRED" if status == 'Transferred' else "VACANT"
                 sic_data.append([unit, nm, st_txt])
             
             t_sic = Table(sic_data, colWidths=[150, 300, 150])
@@ -192,21 +106,21 @@ def generate_combined_pdf(ops_df, dept_df, report_type="Summary"):
         if not ops_df.empty:
             story.append(Paragraph("Shift Operations Roster", heading_style))
             units = sorted(ops_df['Unit'].unique())
-            desks = ['PCR In-Charge', 'Turbine Control Desk', 'Boiler Control Desk', 'Drum Level Desk', 'Boiler API (BAPI)', 'Turbine API (TAPI)']
+            desks = ordered_desks(ops_df['Desk'].unique())
             main_data = [['Position'] + units]
             
+            cells = dict(iter(ops_df.groupby(['Desk', 'Unit'], observed=True)))
             for desk in desks:
                 row = [desk]
                 for u in units:
-                    matches = ops_df[(ops_df['Unit'] == u) & (ops_df['Desk'] == desk)]
-                    if matches.empty: row.append("-")
+                    matches = cells.get((desk, u))
+                    if matches is None: row.append("-")
                     else:
                         cell_content = []
-                        for _, r in matches.iterrows():
-                            nm = format_staff_name(r['Staff_Name'])
-                            if r['Status'] == 'VACANCY':
+                        for nm, status in zip(matches['_display'], matches['Status']):
+                            if status == 'VACANCY':
                                 cell_content.append(Table([[draw_red_cross(), Paragraph("<b>VACANT</b>", normal_style)]], colWidths=[15, 80]))
-                            elif r['Status'] == 'Transferred':
+                            elif status == 'Transferred':
                                 cell_content.append(Table([[draw_orange_flag(), Paragraph(f"<i>{nm}</i>", normal_style)]], colWidths=[15, 80]))
                             else:
                                 cell_content.append(Paragraph(nm, normal_style))
@@ -226,13 +140,11 @@ def generate_combined_pdf(ops_df, dept_df, report_type="Summary"):
 
         # 3. Bottom List: Vacancy & Transfer Details
         story.append(Paragraph("Detailed Vacancy & Transfer List", heading_style))
-        # Filter for relevant rows
-        op_issues = ops_df[ops_df['Status'].isin(['VACANCY', 'Transferred'])].sort_values(['Unit', 'Desk'])
+        # Filter for relevant rows; listed alphabetically by desk, not in DESK_ORDER
+        op_issues = ops_df.loc[ops_df['Status'].isin(['VACANCY', 'Transferred']), ['Unit', 'Desk', '_display', 'Status']].sort_values(['Unit', 'Desk'], key=lambda c: c.astype(str))
         
         list_data = [['Unit', 'Desk', 'Name', 'Status']]
-        for _, r in op_issues.iterrows():
-            nm = format_staff_name(r['Staff_Name'])
-            list_data.append([r['Unit'], r['Desk'], nm, r['Status']])
+        list_data += [list(r) for r in zip(op_issues['Unit'], op_issues['Desk'], op_issues['_display'], op_issues['Status'])]
             
         if len(list_data) > 1:
             t_list = Table(list_data, colWidths=[80, 200, 250, 120])
@@ -252,9 +164,9 @@ def generate_combined_pdf(ops_df, dept_df, report_type="Summary"):
         story.append(Paragraph(f"Type: {report_type} | Generated: {pd.Timestamp.now().strftime('%d-%b-%Y %H:%M')}", styles['Normal']))
         story.append(Spacer(1, 20))
 
-        v_total, t_total, _ = get_global_metrics(ops_df, dept_df, "Global")
-        v_ops, t_ops, _ = get_global_metrics(ops_df, dept_df, "Ops")
-        v_dept, t_dept, _ = get_global_metrics(pd.DataFrame(), dept_df, "Dept")
+        v_total, t_total, _ = global_metrics(ops_df, dept_df, "Global")
+        v_ops, t_ops, _ = global_metrics(ops_df, dept_df, "Ops")
+        v_dept, t_dept, _ = global_metrics(pd.DataFrame(), dept_df, "Dept")
         
         summary_data = [
             ['Section', 'Total Vacancies', 'Total Transferred'],
@@ -285,32 +197,22 @@ def generate_combined_pdf(ops_df, dept_df, report_type="Summary"):
         if report_type == "Summary":
             agg_data = [['Unit', 'Active Staff', 'Vacant', 'Transferred']]
             if not ops_df.empty:
-                groups = ops_df.groupby('Unit')
-                for name, group in groups:
-                    v, t, s = calculate_metrics(group)
-                    agg_data.append([name, s.get('Active', 0), v, t])
+                agg_data += grouped_metrics(ops_df, 'Unit').reset_index().values.tolist()
             t_agg = Table(agg_data, colWidths=[150, 100, 80, 100])
             t_agg.setStyle(TableStyle([('BACKGROUND', (0,0), (-1,0), colors.lightgrey), ('GRID', (0,0), (-1,-1), 0.5, colors.grey)]))
             story.append(t_agg)
         else: # Detailed
             if not ops_df.empty:
                 units = sorted(ops_df['Unit'].unique())
-                desks = ['PCR In-Charge', 'Turbine Control Desk', 'Boiler Control Desk', 'Drum Level Desk', 'Boiler API (BAPI)', 'Turbine API (TAPI)']
+                desks = ordered_desks(ops_df['Desk'].unique())
+                names = ops_df['_display']
+                names = names.mask(ops_df['Status'] == 'Transferred', names + " (Trf)").mask(ops_df['Status'] == 'VACANCY', "VACANT")
+                # Desk x Unit grid of newline-joined name labels
+                grid = ops_df.assign(_label=names).pivot_table(index='Desk', columns='Unit', values='_label', aggfunc="\n".join, observed=True)
+                grid = grid.reindex(index=desks, columns=units)
                 main_data = [['Position'] + units]
                 for desk in desks:
-                    row = [desk]
-                    for u in units:
-                        matches = ops_df[(ops_df['Unit'] == u) & (ops_df['Desk'] == desk)]
-                        if matches.empty: row.append("-")
-                        else:
-                            names = []
-                            for _, r in matches.iterrows():
-                                nm = format_staff_name(r['Staff_Name'])
-                                if r['Status'] == 'VACANCY': nm = "VACANT"
-                                elif r['Status'] == 'Transferred': nm = f"{nm} (Trf)"
-                                names.append(nm)
-                            row.append("\n".join(names))
-                    main_data.append(row)
+                    main_data.append([desk] + [cell if isinstance(cell, str) else "-" for cell in grid.loc[desk]])
                 t_main = Table(main_data, colWidths=[120, 180, 180, 180])
                 t_main.setStyle(TableStyle([('BACKGROUND', (0,0), (-1,0), colors.HexColor('#2c3e50')), ('TEXTCOLOR', (0,0), (-1,0), colors.white), ('GRID', (0,0), (-1,-1), 0.5, colors.black), ('FONTSIZE', (0,0), (-1,-1), 8)]))
                 story.append(t_main)
@@ -321,25 +223,17 @@ def generate_combined_pdf(ops_df, dept_df, report_type="Summary"):
         if not dept_df.empty:
             if report_type == "Summary":
                 agg_data = [['Department', 'Active Staff', 'Vacant', 'Transferred']]
-                groups = dept_df.groupby('Department')
-                for name, group in groups:
-                    v, t, s = calculate_metrics(group)
-                    agg_data.append([name, s.get('Active', 0), v, t])
+                agg_data += grouped_metrics(dept_df, 'Department').reset_index().values.tolist()
                 t_agg = Table(agg_data, colWidths=[250, 100, 80, 100])
                 t_agg.setStyle(TableStyle([('BACKGROUND', (0,0), (-1,0), colors.lightgrey), ('GRID', (0,0), (-1,-1), 0.5, colors.grey)]))
                 story.append(t_agg)
             else:
-                depts = sorted(dept_df['Department'].unique())
-                for d in depts:
-                    group = dept_df[dept_df['Department'] == d]
-                    if group.empty: continue
+                # Categorical groupby yields departments in sorted order, one partition pass for all of them
+                for d, group in dept_df.groupby('Department', observed=True):
                     story.append(Paragraph(f"{d} ({len(group)})", heading_style))
                     d_data = [['Name', 'Designation', 'Status']]
-                    group = group.copy()
-                    group['Rank'] = group['Designation'].apply(get_rank_level)
-                    group = group.sort_values('Rank')
-                    for _, r in group.iterrows():
-                        d_data.append([format_staff_name(r['Staff_Name']), str(r['Designation']), r['Status']])
+                    group = group.iloc[group['Designation'].map(get_rank_level).to_numpy().argsort(kind='quicksort')]
+                    d_data += [list(r) for r in zip(group['_display'], group['Designation'], group['Status'])]
                     t_dept = Table(d_data, colWidths=[250, 150, 100])
                     t_dept.setStyle(TableStyle([('BACKGROUND', (0,0), (-1,0), colors.lightgrey), ('GRID', (0,0), (-1,-1), 0.5, colors.grey)]))
                     story.append(t_dept)
@@ -349,20 +243,81 @@ def generate_combined_pdf(ops_df, dept_df, report_type="Summary"):
     buffer.seek(0)
     return buffer.getvalue()
 
+# --- ROSTER VIEW ---
+def agg_staff_html(x):
+    """Concatenated badge divs (vacant, transferred or active) for everyone in x."""
+    names = x['_display']
+    html = np.where(x['Status'] == 'VACANCY', '<div class="badge-vacant">🔴 VACANT</div>',
+                    np.where(x['Status'] == 'Transferred', '<div class="badge-transfer">🟠 ' + names + '</div>',
+                             '<div class="badge-active">👤 ' + names + '</div>'))
+    return "".join(html)
+
+@st.cache_data(show_spinner=False)
+def roster_table_html(version, _op_df):
+    # `version` is the frame fingerprint; the frame itself is not re-hashed.
+    # Emits a Desk x Unit HTML table of staff badges, one row per desk.
+    units = sorted(_op_df['Unit'].unique())
+    # One partition pass; empty (desk, unit) cells are simply absent from the dict.
+    badges = {key: agg_staff_html(group) for key, group in _op_df.groupby(['Desk', 'Unit'], observed=True)}
+    rows = []
+    for desk in ordered_desks(_op_df['Desk'].unique()):
+        cells = [f"<td><b>{desk}</b></td>"]
+        for unit in units:
+            cells.append(f"<td>{badges.get((desk, unit), '-')}</td>")
+        rows.append(f"<tr>{''.join(cells)}</tr>")
+    head = "".join(f"<th>{c}</th>" for c in ["Desk"] + units)
+    return (f'<table border="1" class="dataframe table table-bordered"><thead><tr style="text-align: right;">{head}</tr></thead>'
+            f'<tbody>{"".join(rows)}</tbody></table>')
+
+@st.cache_data(show_spinner=False)
+def status_pie(counts, hole=0, **layout):
+    """Status pie from (status, count) pairs; unchanged counts reuse the built figure.
+
+    Values go in as a numpy array so Plotly ships them as a base64 typed array."""
+    names = [s for s, _ in counts]
+    values = np.fromiter((c for _, c in counts), dtype=np.int32, count=len(counts))
+    pie = go.Pie(values=values, labels=names, hole=hole, marker=dict(colors=[STATUS_COLORS.get(s) for s in names]))
+    return go.Figure(data=[pie], layout=layout)
+
+def paginate(df, key):
+    """Returns the rows of df for the selected page, so only one page is sent to the browser."""
+    pages = -(-len(df) // PAGE_SIZE)
+    if pages <= 1: return df
+    page = st.number_input(f"Page (1-{pages})", min_value=1, max_value=pages, value=1, key=key)
+    return df.iloc[(page - 1) * PAGE_SIZE : page * PAGE_SIZE]
+
+# --- HIERARCHY VIEW ---
+RANK_LABELS = {1: ("👑 Executive Engineer (EE)", "rank-ee"), 2: ("⭐ Addl. Executive Engineer (AD.EE)", "rank-ad"), 3: ("🔷 Dy. Executive Engineer (DY.EE)", "rank-dy"), 4: ("🔧 Assistant Engineer (AE)", "rank-ae"), 5: ("🛠️ Junior Engineer (JE)", "rank-je"), 6: ("📋 Other Staff", "rank-je")}
+
+def render_hierarchy(group):
+    # Ranks are kept alongside as an array, so the (read-only) group is never copied to add a column
+    ranks = group['Designation'].map(get_rank_level).to_numpy()
+    order = ranks.argsort(kind='quicksort')
+    sorted_staff, ranks = group.iloc[order], ranks[order]
+    for rank in range(1, 7):
+        sub_group = sorted_staff[ranks == rank]
+        if not sub_group.empty:
+            label, css_class = RANK_LABELS[rank]
+            st.markdown(f'<div class="rank-box {css_class}">{label}</div>', unsafe_allow_html=True)
+            cols = st.columns(3)
+            icons = status_icons(sub_group['Status'])
+            for i, (name, icon) in enumerate(zip(sub_group['_display'], icons)):
+                cols[i % 3].markdown(f"&nbsp;&nbsp;&nbsp;&nbsp;{icon} **{name}**")
+
 # --- HEADER & NAVIGATION ---
 st.title("⚡ Mahagenco Staffing Portal")
 
 # Sidebar
 if st.sidebar.button("🔄 Refresh Data"):
-    st.cache_data.clear()
+    clear_data_cache()
     st.rerun()
 
 st.sidebar.markdown("---")
 st.sidebar.header("Report Options")
 report_type = st.sidebar.radio("PDF Type", ["Summary (Numbers)", "Detailed (Names)", "Single Page Op Vacancy"])
 
-ops_df = load_data(OPS_FILE)
-dept_df = load_data(DEPT_FILE)
+ops_df, ops_version = load_versioned(OPS_FILE)
+dept_df, dept_version = load_versioned(DEPT_FILE)
 
 if st.sidebar.button("📄 Generate PDF Report"):
     with st.spinner("Generating..."):
@@ -373,7 +328,6 @@ if st.sidebar.button("📄 Generate PDF Report"):
             st.sidebar.download_button("⬇️ Download PDF", pdf_bytes, f"Report_{report_type.replace(' ','_')}.pdf", "application/pdf")
 
 view_mode = st.radio("", [VIEW_OPS, VIEW_DEPT], horizontal=True, label_visibility="collapsed")
-active_df = ops_df if view_mode == VIEW_OPS else dept_df
 
 st.markdown("---")
 
@@ -383,20 +337,20 @@ with tab1:
     if view_mode == VIEW_OPS:
         if ops_df.empty: st.error("Data Missing for Shift Ops.")
         else:
-            op_df = ops_df[ops_df['Desk'] != 'Shift In-Charge']
-            vacant_count, transferred_count, status_counts = get_global_metrics(ops_df, dept_df, "Ops")
+            op_df = roster_rows(ops_version, ops_df)
+            vacant_count, transferred_count, status_counts = global_metrics(ops_df, dept_df, "Ops", (ops_version, dept_version))
             
             c1, c2, c3 = st.columns([1, 1.5, 1.2])
             with c1:
                 st.markdown("##### Staff Status")
-                fig1 = px.pie(values=status_counts.values, names=status_counts.index, 
-                              color=status_counts.index, color_discrete_map={'VACANCY':'#ff4b4b', 'Transferred':'#ffa421', 'Active':'#00CC96'}, hole=0.4, height=350)
+                fig1 = status_pie(tuple(status_counts.items()), hole=0.4, height=350)
                 st.plotly_chart(fig1, use_container_width=True)
             with c2:
                 st.markdown("##### Gaps by Unit")
-                gaps_df = op_df[op_df['Status'].isin(['VACANCY', 'Transferred'])]
-                if not gaps_df.empty:
-                    fig2 = px.histogram(gaps_df, x="Unit", color="Status", barmode="group", color_discrete_map={'VACANCY':'#ff4b4b', 'Transferred':'#ffa421'}, text_auto=True, height=350)
+                # One row per (Unit, Status) with its count
+                gap_counts = unit_gaps(ops_version, op_df)
+                if not gap_counts.empty:
+                    fig2 = px.bar(gap_counts, x="Unit", y="Count", color="Status", barmode="group", color_discrete_map=STATUS_COLORS, text_auto=True, height=350)
                     st.plotly_chart(fig2, use_container_width=True)
                 else: st.success("No Manpower Gaps!")
             with c3:
@@ -406,191 +360,163 @@ with tab1:
                 m2.metric("Transferred", transferred_count)
 
             st.subheader("👨‍✈️ Shift In-Charge (EE)")
-            sic_dept = dept_df[dept_df['Department'].str.contains('Shift In-Charge', na=False)]
+            sic_dept = sic_rows(dept_version, dept_df)
             if not sic_dept.empty:
-                u67_names = sic_dept[sic_dept['Department'] == 'Shift In-Charge (U6&7)']['Staff_Name'].unique()
-                u8_names = sic_dept[sic_dept['Department'] == 'Shift In-Charge (U8)']['Staff_Name'].unique()
-                sic_data = []
-                max_len = max(len(u67_names), len(u8_names))
-                for i in range(max_len):
-                    n67, s67_icon = "", ""
-                    if i < len(u67_names):
-                        nm = u67_names[i]
-                        n67 = format_staff_name(nm)
-                        stat = sic_dept[sic_dept['Staff_Name'] == nm]['Status'].values
-                        s67_icon = "🟠" if "Transferred" in stat else "🟢"
-                    n8, s8_icon = "", ""
-                    if i < len(u8_names):
-                        nm = u8_names[i]
-                        n8 = format_staff_name(nm)
-                        stat = sic_dept[sic_dept['Staff_Name'] == nm]['Status'].values
-                        s8_icon = "🟠" if "Transferred" in stat else "🟢"
-                    sic_data.append({"Unit 6 & 7 (Common Pool)": f"{s67_icon} {n67}", "Unit 8": f"{s8_icon} {n8}"})
-                st.dataframe(pd.DataFrame(sic_data), use_container_width=True, hide_index=True)
+                # Whether any row of each name is Transferred, from one grouped reduction
+                transferred = (sic_dept['Status'] == 'Transferred').groupby(sic_dept['Staff_Name']).any()
+                shown = dict(zip(sic_dept['Staff_Name'], sic_dept['_display']))
+                sic_cols = {}
+                for label, dept in (("Unit 6 & 7 (Common Pool)", 'Shift In-Charge (U6&7)'), ("Unit 8", 'Shift In-Charge (U8)')):
+                    names = sic_dept.loc[sic_dept['Department'] == dept, 'Staff_Name'].unique()
+                    sic_cols[label] = [f"{'🟠' if transferred[nm] else '🟢'} {shown[nm]}" for nm in names]
+                max_len = max(len(v) for v in sic_cols.values())
+                st.dataframe(pd.DataFrame({k: v + [" "] * (max_len - len(v)) for k, v in sic_cols.items()}), use_container_width=True, hide_index=True)
             
             st.divider()
-            def agg_staff_html(x):
-                html = []
-                for _, row in x.iterrows():
-                    name = format_staff_name(row['Staff_Name'])
-                    if row['Status'] == 'VACANCY': html.append(f'<div class="badge-vacant">🔴 VACANT</div>')
-                    elif row['Status'] == 'Transferred': html.append(f'<div class="badge-transfer">🟠 {name}</div>')
-                    else: html.append(f'<div class="badge-active">👤 {name}</div>')
-                return "".join(html)
-            units = sorted(op_df['Unit'].unique())
-            desks = ['PCR In-Charge', 'Turbine Control Desk', 'Boiler Control Desk', 'Drum Level Desk', 'Boiler API (BAPI)', 'Turbine API (TAPI)']
-            table_data = []
-            for desk in desks:
-                row = {"Desk": f"<b>{desk}</b>"}
-                for unit in units:
-                    match = op_df[(op_df['Unit']==unit) & (op_df['Desk']==desk)]
-                    row[unit] = "-" if match.empty else agg_staff_html(match)
-                table_data.append(row)
-            st.write(pd.DataFrame(table_data).to_html(escape=False, index=False, classes="table table-bordered"), unsafe_allow_html=True)
+            st.write(roster_table_html(ops_version, op_df), unsafe_allow_html=True)
 
     else:
         if dept_df.empty: st.error("Data Missing.")
         else:
+            dept_counts, desg_counts = dept_strength(dept_version, dept_df)
             c1, c2 = st.columns([2, 1])
             with c1:
-                chart_df = active_df.copy()
-                chart_df.loc[chart_df['Department'].str.contains('CHP'), 'Department'] = 'Coal Handling Plant'
-                dept_counts = chart_df['Department'].value_counts().reset_index()
-                dept_counts.columns = ['Department', 'Count']
                 fig = px.bar(dept_counts, x='Department', y='Count', text_auto=True, color='Count', title="Department Strength", height=350)
                 st.plotly_chart(fig, use_container_width=True)
             with c2:
-                desg_counts = active_df['Designation'].value_counts().head(5).reset_index()
                 fig2 = px.pie(desg_counts, values='count', names='Designation', hole=0.4, title="Top Designations", height=350)
                 st.plotly_chart(fig2, use_container_width=True)
             st.divider()
             st.subheader("🏛️ Departmental Staff Hierarchy")
-            all_departments = sorted(active_df['Department'].unique())
+            # Cached per data version: department -> row positions, so no folder re-scans the frame
+            dept_rows = row_positions(dept_version, 'Department', dept_df)
+            all_departments = sorted(dept_rows)
             chp_folders = [d for d in all_departments if 'CHP' in d]
             ops_folders = [d for d in all_departments if 'Main Plant Ops' in d]
             sic_folders = [d for d in all_departments if 'Shift In-Charge' in d]
             standard_folders = [d for d in all_departments if 'CHP' not in d and 'Main Plant Ops' not in d and 'Shift In-Charge' not in d]
             
-            def render_hierarchy(group):
-                group = group.copy()
-                group['Rank'] = group['Designation'].apply(get_rank_level)
-                sorted_staff = group.sort_values(by='Rank')
-                rank_labels = {1: ("👑 Executive Engineer (EE)", "rank-ee"), 2: ("⭐ Addl. Executive Engineer (AD.EE)", "rank-ad"), 3: ("🔷 Dy. Executive Engineer (DY.EE)", "rank-dy"), 4: ("🔧 Assistant Engineer (AE)", "rank-ae"), 5: ("🛠️ Junior Engineer (JE)", "rank-je"), 6: ("📋 Other Staff", "rank-je")}
-                for rank in range(1, 7):
-                    sub_group = sorted_staff[sorted_staff['Rank'] == rank]
-                    if not sub_group.empty:
-                        label, css_class = rank_labels[rank]
-                        st.markdown(f'<div class="rank-box {css_class}">{label}</div>', unsafe_allow_html=True)
-                        cols = st.columns(3)
-                        for i, (_, row) in enumerate(sub_group.iterrows()):
-                            name = format_staff_name(row['Staff_Name'])
-                            status_icon = "🔴" if row['Status'] == 'VACANCY' else "🟠" if row['Status'] == 'Transferred' else "🟢"
-                            cols[i % 3].markdown(f"&nbsp;&nbsp;&nbsp;&nbsp;{status_icon} **{name}**")
-
             if sic_folders:
-                sic_total = sum([len(active_df[active_df['Department'] == d]) for d in sic_folders])
+                sic_total = sum([len(dept_rows[d]) for d in sic_folders])
                 with st.expander(f"👨‍✈️ Shift In-Charge (Total: {sic_total})", expanded=False):
                     for d in sic_folders:
                         st.markdown(f"**{d}**")
-                        render_hierarchy(active_df[active_df['Department'] == d])
+                        render_hierarchy(dept_df.iloc[dept_rows[d]])
             
             if ops_folders:
-                ops_total = sum([len(active_df[active_df['Department'] == d]) for d in ops_folders])
+                ops_total = sum([len(dept_rows[d]) for d in ops_folders])
                 with st.expander(f"🏭 Main Plant PCR Staff (Total: {ops_total})", expanded=False):
                     ops_tabs = st.tabs([d.replace("Main Plant Ops - ", "") for d in ops_folders])
                     for tab, dept_name in zip(ops_tabs, ops_folders):
-                        with tab: render_hierarchy(active_df[active_df['Department'] == dept_name])
+                        with tab: render_hierarchy(dept_df.iloc[dept_rows[dept_name]])
 
             if chp_folders:
-                chp_total = sum([len(active_df[active_df['Department'] == d]) for d in chp_folders])
+                chp_total = sum([len(dept_rows[d]) for d in chp_folders])
                 with st.expander(f"🏭 Coal Handling Plant (Total: {chp_total})", expanded=False):
                     chp_tabs = st.tabs([d.replace("CHP", "").strip() for d in chp_folders])
                     for tab, dept_name in zip(chp_tabs, chp_folders):
-                        with tab: render_hierarchy(active_df[active_df['Department'] == dept_name])
+                        with tab: render_hierarchy(dept_df.iloc[dept_rows[dept_name]])
 
             for dept_name in standard_folders:
-                group = active_df[active_df['Department'] == dept_name]
+                group = dept_df.iloc[dept_rows[dept_name]]
                 if group.empty: continue
                 with st.expander(f"📂 {dept_name} ({len(group)} Staff)", expanded=False):
                     render_hierarchy(group)
 
-with tab2:
+# Search and admin run as fragments: their widgets rerun only their own tab, not the dashboard.
+@st.fragment
+def search_panel(ops_df, ops_version, dept_df, dept_version):
     st.header("Search & Reports")
     search_tabs = st.tabs(["⚡ Shift Operations Search", "🏢 Departmental Staff Search"])
     
     with search_tabs[0]:
         st.subheader("Search in Shift Operations")
-        c_op1, c_op2 = st.columns(2)
-        s_unit = c_op1.selectbox("Filter Unit", ["All"] + sorted(ops_df['Unit'].unique().tolist()), key="s_unit")
-        s_desk = c_op2.selectbox("Filter Desk", ["All"] + sorted(ops_df['Desk'].unique().tolist()), key="s_desk")
-        ops_filtered = ops_df.copy()
-        if s_unit != "All": ops_filtered = ops_filtered[ops_filtered['Unit'] == s_unit]
-        if s_desk != "All": ops_filtered = ops_filtered[ops_filtered['Desk'] == s_desk]
+        with st.form("ops_filters"):
+            c_op1, c_op2 = st.columns(2)
+            s_unit = c_op1.selectbox("Filter Unit", ["All"] + dimension_values(ops_version, 'Unit', ops_df), key="s_unit")
+            s_desk = c_op2.selectbox("Filter Desk", ["All"] + dimension_values(ops_version, 'Desk', ops_df), key="s_desk")
+            st.form_submit_button("Apply Filters")
+        # Only re-filter when the submitted filters or the data actually changed
+        ops_filter_key = (ops_version, s_unit, s_desk)
+        if st.session_state.get('ops_filter_key') != ops_filter_key:
+            mask = np.ones(len(ops_df), dtype=bool)
+            if s_unit != "All": mask &= (ops_df['Unit'] == s_unit).to_numpy()
+            if s_desk != "All": mask &= (ops_df['Desk'] == s_desk).to_numpy()
+            st.session_state.ops_filter_key = ops_filter_key
+            st.session_state.ops_filtered = ops_df[mask]
+        ops_filtered = st.session_state.ops_filtered
         if not ops_filtered.empty:
             c1, c2 = st.columns(2)
             with c1:
                 _, _, s_counts = get_global_metrics(ops_filtered, pd.DataFrame(), "Ops")
                 if not s_counts.empty:
-                    fig_s = px.pie(values=s_counts.values, names=s_counts.index, color=s_counts.index, color_discrete_map={'VACANCY':'#ff4b4b', 'Transferred':'#ffa421', 'Active':'#00CC96'}, title="Status", height=250)
+                    fig_s = status_pie(tuple(s_counts.items()), title="Status", height=250)
                     st.plotly_chart(fig_s, use_container_width=True)
-            st.dataframe(ops_filtered[['Unit', 'Desk', 'Staff_Name', 'Status']], use_container_width=True, hide_index=True)
+            st.dataframe(paginate(ops_filtered, "ops_page")[['Unit', 'Desk', 'Staff_Name', 'Status']], use_container_width=True, hide_index=True)
         else: st.info("No records found.")
 
     with search_tabs[1]:
         st.subheader("Search in Departments")
-        s_dept = st.selectbox("Filter Department", ["All"] + sorted(dept_df['Department'].unique().tolist()), key="s_dept")
-        dept_filtered = dept_df.copy()
-        if s_dept != "All": dept_filtered = dept_filtered[dept_filtered['Department'] == s_dept]
+        with st.form("dept_filters"):
+            s_dept = st.selectbox("Filter Department", ["All"] + dimension_values(dept_version, 'Department', dept_df), key="s_dept")
+            st.form_submit_button("Apply Filters")
+        dept_filter_key = (dept_version, s_dept)
+        if st.session_state.get('dept_filter_key') != dept_filter_key:
+            mask = np.ones(len(dept_df), dtype=bool)
+            if s_dept != "All": mask &= (dept_df['Department'] == s_dept).to_numpy()
+            st.session_state.dept_filter_key = dept_filter_key
+            st.session_state.dept_filtered = dept_df[mask]
+        dept_filtered = st.session_state.dept_filtered
         if not dept_filtered.empty:
             c1, c2 = st.columns(2)
             with c1:
                 _, _, s_counts = get_global_metrics(pd.DataFrame(), dept_filtered, "Dept")
                 if not s_counts.empty:
-                    fig_s = px.pie(values=s_counts.values, names=s_counts.index, color=s_counts.index, color_discrete_map={'VACANCY':'#ff4b4b', 'Transferred':'#ffa421', 'Active':'#00CC96'}, title="Status", height=250)
+                    fig_s = status_pie(tuple(s_counts.items()), title="Status", height=250)
                     st.plotly_chart(fig_s, use_container_width=True)
-            st.dataframe(dept_filtered[['Department', 'Staff_Name', 'Designation', 'Status']], use_container_width=True, hide_index=True)
+            st.dataframe(paginate(dept_filtered, "dept_page")[['Department', 'Staff_Name', 'Designation', 'Status']], use_container_width=True, hide_index=True)
         else: st.info("No records found.")
 
-with tab3:
+with tab2:
+    search_panel(ops_df, ops_version, dept_df, dept_version)
+
+@st.fragment
+def admin_panel(view_mode, ops_df, ops_version, dept_df, dept_version):
     st.header("Admin")
-    if not st.session_state.admin_logged_in:
-        if st.text_input("Password", type="password")=="admin123" and st.button("Login"):
-            st.session_state.admin_logged_in=True
-            st.rerun()
-    else:
+    if check_password():
         if st.button("Logout"):
             st.session_state.admin_logged_in=False
             st.rerun()
         st.write(f"Editing: **{view_mode}**")
-        working_df = ops_df if view_mode == VIEW_OPS else dept_df
+        working_df = (ops_df if view_mode == VIEW_OPS else dept_df).copy()
         target_file = OPS_FILE if view_mode == VIEW_OPS else DEPT_FILE
         if working_df.empty: st.error("Cannot edit empty dataset.")
         else:
             act = st.selectbox("Action", ["Change Status", "Add Person"])
             if act == "Change Status":
                 if view_mode == VIEW_OPS:
-                    u = st.selectbox("Unit", working_df['Unit'].unique())
-                    d = st.selectbox("Desk", working_df[working_df['Unit']==u]['Desk'].unique())
-                    p_list = working_df[(working_df['Unit']==u)&(working_df['Desk']==d)]
+                    u = st.selectbox("Unit", dimension_values(ops_version, 'Unit', ops_df))
+                    d = st.selectbox("Desk", unit_desks(ops_version, ops_df).get(u, []))
+                    p_list = working_df.iloc[row_positions(ops_version, ('Unit', 'Desk'), ops_df).get((u, d), [])]
                 else:
-                    dept = st.selectbox("Department", working_df['Department'].unique())
-                    p_list = working_df[working_df['Department']==dept]
+                    dept = st.selectbox("Department", dimension_values(dept_version, 'Department', dept_df))
+                    p_list = working_df.iloc[row_positions(dept_version, 'Department', dept_df).get(dept, [])]
                 if not p_list.empty:
                     p = st.selectbox("Person", p_list['Staff_Name'].unique())
                     s = st.selectbox("New Status", ["Active", "Transferred", "VACANCY"])
                     if st.button("Update Status"):
-                        idx = p_list[p_list['Staff_Name']==p].index[0]
-                        working_df.at[idx,'Status'] = s
-                        if s=='VACANCY': working_df.at[idx,'Staff_Name']="VACANT"
+                        idx = p_list.index[np.flatnonzero((p_list['Staff_Name'] == p).to_numpy())[0]]
+                        if s=='VACANCY': working_df.loc[idx, ['Staff_Name', 'Status']] = ["VACANT", s]
+                        else: working_df.at[idx,'Status'] = s
                         save_local(working_df, target_file)
-                        update_github(working_df, target_file)
+                        update_github(target_file)
                         st.success("Updated!")
                         st.rerun()
             elif act == "Add Person":
                 st.subheader("Add New Staff Member")
                 if view_mode == VIEW_DEPT:
                     c1, c2 = st.columns(2)
-                    new_dept = c1.selectbox("Select Department", sorted(working_df['Department'].unique()))
+                    new_dept = c1.selectbox("Select Department", dimension_values(dept_version, 'Department', dept_df))
                     new_name = c2.text_input("Full Name")
                     c3, c4 = st.columns(2)
                     new_desg = c3.selectbox("Designation", ["EE", "AD.EE", "DY.EE", "AE", "JE", "Other"])
@@ -598,29 +524,31 @@ with tab3:
                     if st.button("Add to Department"):
                         if new_name:
                             new_row = {"Department": new_dept, "Staff_Name": new_name, "Designation": new_desg, "SAP_ID": new_sap, "Status": "Active", "Action_Required": ""}
-                            working_df = pd.concat([working_df, pd.DataFrame([new_row])], ignore_index=True)
-                            save_local(working_df, target_file)
-                            update_github(working_df, target_file)
+                            append_local(new_row, target_file)
+                            update_github(target_file)
                             st.success(f"Added {new_name} to {new_dept}")
                             st.rerun()
                         else: st.error("Name is required.")
                 else:
                     c1, c2 = st.columns(2)
                     new_unit = c1.selectbox("Unit", ["Unit 6", "Unit 7", "Unit 8"])
-                    new_desk = c2.selectbox("Desk", working_df['Desk'].unique())
+                    new_desk = c2.selectbox("Desk", dimension_values(ops_version, 'Desk', ops_df))
                     new_name = st.text_input("Staff Name")
                     if st.button("Add to Roster"):
                         if new_name:
-                            vac_check = working_df[(working_df['Unit']==new_unit) & (working_df['Desk']==new_desk) & (working_df['Status']=='VACANCY')]
-                            if not vac_check.empty:
-                                idx = vac_check.index[0]
-                                working_df.at[idx, 'Staff_Name'] = new_name
-                                working_df.at[idx, 'Status'] = "Active"
+                            slot = working_df.iloc[row_positions(ops_version, ('Unit', 'Desk'), ops_df).get((new_unit, new_desk), [])]
+                            vacant_rows = np.flatnonzero((slot['Status'] == 'VACANCY').to_numpy())
+                            if len(vacant_rows):
+                                idx = slot.index[vacant_rows[0]]
+                                working_df.loc[idx, ['Staff_Name', 'Status']] = [new_name, "Active"]
+                                save_local(working_df, target_file)
                             else:
                                 new_row = {"Unit": new_unit, "Desk": new_desk, "Staff_Name": new_name, "Status": "Active", "Action_Required": ""}
-                                working_df = pd.concat([working_df, pd.DataFrame([new_row])], ignore_index=True)
-                            save_local(working_df, target_file)
-                            update_github(working_df, target_file)
+                                append_local(new_row, target_file)
+                            update_github(target_file)
                             st.success(f"Added {new_name} to {new_desk}")
                             st.rerun()
                         else: st.error("Name is required.")
+
+with tab3:
+    admin_panel(view_mode, ops_df, ops_version, dept_df, dept_version)
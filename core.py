@@ -0,0 +1,365 @@
+import streamlit as st
+import pandas as pd
+import numpy as np
+import hashlib
+import hmac
+import os
+import pyarrow as pa
+import pyarrow.parquet as papq
+from concurrent.futures import ThreadPoolExecutor
+
+# --- CONFIGURATION & CONSTANTS ---
+OPS_FILE = 'stitched_staffing_data.csv'
+DEPT_FILE = 'departmental_staffing_data.csv'
+REPO_NAME = "Chinmay-Dev27/mahagenco-staffing-dashboard"
+# Only the digest is kept in memory; override the default with the ADMIN_PASS env var
+_ADMIN_HASH = hashlib.sha256(os.environ.get("ADMIN_PASS", "admin123").encode()).digest()
+
+DESK_ORDER = ['PCR In-Charge', 'Turbine Control Desk', 'Boiler Control Desk', 'Drum Level Desk', 'Boiler API (BAPI)', 'Turbine API (TAPI)']
+STATUS_ORDER = ['VACANCY', 'Transferred', 'Active']
+TEXT_COLUMNS = pd.Index(['Staff_Name', 'Action_Required', 'Original_Line'])
+TEXT_DTYPE = pd.StringDtype('pyarrow')
+SIDECAR_SOURCE_KEY = b'source_csv_stamp'
+STATUS_COLORS = {'VACANCY': '#ff4b4b', 'Transferred': '#ffa421', 'Active': '#00CC96'}
+STATUS_ICONS = {'VACANCY': "🔴", 'Transferred': "🟠"}
+
+# --- DATA FUNCTIONS ---
+def _persisted(df):
+    # sort_index restores file order for frames the loader re-sorted
+    return df.drop(columns=[c for c in df.columns if c.startswith('_')]).sort_index()
+
+@st.cache_resource
+def _github_repo():
+    # PyGithub is only needed once an admin saves, so it is not imported on every cold start
+    from github import Github
+    return Github(st.secrets["github"]["token"]).get_repo(REPO_NAME)
+
+@st.cache_resource
+def _sync_worker():
+    # A single worker keeps pushes in order, so each one builds on the sha the previous returned.
+    # `queued` holds only the newest unpushed content per file, so a burst of edits becomes one commit.
+    # `outcome` keeps the last real push's error (or None) per file for the jobs it carried.
+    return ThreadPoolExecutor(max_workers=1), {'shas': {}, 'queued': {}, 'outcome': {}}
+
+def _push(repo, state, filename):
+    # Runs on the worker thread: no st.* calls here, errors travel back through the future.
+    body = state['queued'].pop(filename, None)
+    if body is None:
+        # An earlier job already sent this file's newest content; with one worker it was the
+        # last real push for the file, so its result is this job's result too.
+        error = state['outcome'].get(filename)
+        if error: raise error
+        return
+    shas = state['shas']
+    try:
+        sha = shas.get(filename) or repo.get_contents(filename).sha
+    except Exception:
+        sha = None
+    try:
+        if sha: result = repo.update_file(filename, f"Admin Update {filename}", body, sha)
+        else: result = repo.create_file(filename, "Initial Commit", body)
+    except Exception as e:
+        shas.pop(filename, None)  # likely a stale sha; re-read it on the next push
+        state['outcome'][filename] = e
+        raise
+    shas[filename] = result['content'].sha
+    state['outcome'][filename] = None
+
+def update_github(filename):
+    """Queues a push of the saved CSV in the background; failures are shown on a later rerun by report_sync_errors.
+    The bytes already on disk are sent as-is, so the frame is not serialised a second time."""
+    with open(filename, 'rb') as f:
+        body = f.read()
+    try:
+        repo = _github_repo()
+    except Exception as e:
+        st.error(f"GitHub Sync Error: {e}")
+        return False
+    pool, state = _sync_worker()
+    state['queued'][filename] = body
+    st.session_state.setdefault('github_syncs', []).append(pool.submit(_push, repo, state, filename))
+    return True
+
+def report_sync_errors():
+    """Shows errors from finished background pushes, toasts the ones that landed and keeps the ones still running."""
+    pending, errors, synced = [], {}, 0
+    for fut in st.session_state.get('github_syncs', []):
+        if not fut.done(): pending.append(fut)
+        elif fut.exception(): errors[id(fut.exception())] = fut.exception()  # coalesced jobs share one error
+        else: synced += 1
+    for e in errors.values(): st.error(f"GitHub Sync Error: {e}")
+    if pending: st.toast("Syncing changes to GitHub…", icon="⏳")
+    elif synced and not errors: st.toast("Changes synced to GitHub", icon="✅")
+    st.session_state.github_syncs = pending
+
+def _sidecar(filename):
+    return os.path.splitext(filename)[0] + '.parquet'
+
+def _source_stamp(filename):
+    # Identifies the CSV revision a sidecar was built from: mtime in ns plus size.
+    stat = os.stat(filename)
+    return f"{stat.st_mtime_ns}:{stat.st_size}".encode()
+
+def _write_sidecar(df, filename):
+    # The parquet copy is only a read accelerator; the CSV stays canonical.
+    try:
+        table = pa.Table.from_pandas(df, preserve_index=False)
+        table = table.replace_schema_metadata({**table.schema.metadata, SIDECAR_SOURCE_KEY: _source_stamp(filename)})
+        papq.write_table(table, _sidecar(filename), compression='snappy')
+    except Exception:
+        pass
+
+def _drop_sidecar(filename):
+    # Called after an in-place CSV edit, so the next load re-parses the CSV.
+    try:
+        os.remove(_sidecar(filename))
+    except OSError:
+        pass
+
+def _read_table(filename):
+    pq = _sidecar(filename)
+    try:
+        # Served only if it was built from exactly this revision of the CSV.
+        if papq.read_schema(pq).metadata.get(SIDECAR_SOURCE_KEY) == _source_stamp(filename):
+            return pd.read_parquet(pq, engine='pyarrow')
+    except Exception:
+        pass
+    df = pd.read_csv(filename, dtype=str, keep_default_na=False, engine='pyarrow')
+    _write_sidecar(df, filename)
+    return df
+
+def _as_category(col, order=()):
+    # Known values keep their given order (Status sorts worst-first); anything
+    # unexpected in the file is appended rather than silently dropped.
+    extras = sorted(set(col.unique()) - set(order))
+    return col.astype(pd.CategoricalDtype(list(order) + extras, ordered=bool(order)))
+
+@st.cache_resource(max_entries=4)
+def _load(filename, mtime):
+    # Keyed on the file's mtime, so only a real write triggers a re-parse.
+    # The frame is shared across sessions: copy before mutating it.
+    try:
+        df = _read_table(filename)
+        if filename == OPS_FILE and 'Desk' not in df.columns: return pd.DataFrame()
+        if 'Status' not in df.columns: df['Status'] = 'Active'
+        if 'Action_Required' not in df.columns: df['Action_Required'] = ''
+        df = df.fillna("")
+        # Free-text columns are Arrow-backed strings on both pandas 2 and 3.
+        for col in TEXT_COLUMNS.intersection(df.columns): df[col] = df[col].astype(TEXT_DTYPE)
+        df['Status'] = _as_category(df['Status'], STATUS_ORDER)
+        if 'Unit' in df.columns: df['Unit'] = _as_category(df['Unit'])
+        if 'Desk' in df.columns: df['Desk'] = _as_category(df['Desk'], DESK_ORDER)
+        if 'Department' in df.columns: df['Department'] = _as_category(df['Department'])
+        # Derived, underscore-prefixed columns are never written back to disk.
+        df['_display'] = display_names(df['Staff_Name'])
+        # Roster rows are kept grouped by (Unit, Desk) so groupbys and the grid walk contiguous runs.
+        # The original index is kept; _persisted uses it to write rows back in file order.
+        if 'Desk' in df.columns: df = df.sort_values(['Unit', 'Desk'], kind='stable')
+        return df
+    except Exception:
+        # A missing, empty or malformed file shows as no data rather than a traceback.
+        return pd.DataFrame()
+
+def _mtime(filename):
+    try:
+        return os.path.getmtime(filename)
+    except OSError:
+        return None
+
+@st.cache_resource(max_entries=4)
+def _load_version(filename, mtime):
+    return frame_version(_load(filename, mtime))
+
+def load_versioned(filename):
+    """The loaded frame plus its frame_version, both taken from the same revision of the file.
+    The fingerprint is computed once per file mtime."""
+    mtime = _mtime(filename)
+    if mtime is None: return pd.DataFrame(), 0
+    return _load(filename, mtime), _load_version(filename, mtime)
+
+def clear_data_cache(filename=None):
+    """Drops every cached frame, or only filename's current entry so the other file stays warm."""
+    if filename is None:
+        _load.clear()
+        _load_version.clear()
+    else:
+        mtime = _mtime(filename)
+        _load.clear(filename, mtime)
+        _load_version.clear(filename, mtime)
+
+def save_local(df, filename):
+    clear_data_cache(filename)
+    df = _persisted(df)
+    df.to_csv(filename, index=False)
+    _write_sidecar(df, filename)
+
+def append_local(row, filename):
+    """Appends one record as a single line at the end of the CSV."""
+    header = pd.read_csv(filename, nrows=0).columns
+    line = pd.DataFrame([row]).reindex(columns=header).to_csv(index=False, header=False)
+    with open(filename, 'rb') as f:
+        f.seek(-1, os.SEEK_END)
+        if f.read(1) != b'\n': line = '\n' + line
+    clear_data_cache(filename)
+    with open(filename, 'a', newline='', encoding='utf-8') as f:
+        f.write(line)
+    _drop_sidecar(filename)
+
+def check_password():
+    """Renders the admin login form; returns True once the session is authenticated."""
+    if st.session_state.admin_logged_in: return True
+    pwd = st.text_input("Password", type="password")
+    if hmac.compare_digest(hashlib.sha256(pwd.encode()).digest(), _ADMIN_HASH) and st.button("Login"):
+        st.session_state.admin_logged_in = True
+        st.rerun()
+    return False
+
+def status_icon(status):
+    return STATUS_ICONS.get(status, "🟢")
+
+def map_categories(statuses, fn):
+    """Applies fn once per category and broadcasts the results over the codes."""
+    statuses = statuses.astype('category')
+    table = np.array([fn(c) for c in statuses.cat.categories] + [fn(None)])
+    return table[statuses.cat.codes.to_numpy()]
+
+def status_icons(statuses):
+    return map_categories(statuses, status_icon)
+
+_TRF_PATTERN = r'\s*\((?:Transferred|Trf)\)'
+_DESG_PATTERN = r'^(.*?)\s+(JE|AE|DY\.? ?EE|ADD\.? ?EE|AD\.? ?EE|EE)\b.*$'
+
+def display_names(names):
+    """Display form of each staff name: transfer tags dropped and a trailing designation put in brackets ("X (AE)"),
+    with any VACANT entry shown as "VACANT". Two vectorised replaces over the whole column."""
+    clean = names.str.replace(_TRF_PATTERN, '', case=False, regex=True).str.strip()
+    clean = clean.str.replace(_DESG_PATTERN, r'\1 (\2)', case=False, regex=True)
+    return clean.mask(names.str.contains("VACANT", regex=False), "VACANT")
+
+def get_rank_level(desg):
+    d = str(desg).upper().replace('.', '').strip()
+    if 'EXECUTIVE' in d or 'EE' in d:
+        if 'ADD' in d or 'AD' in d: return 2
+        if 'DY' in d: return 3
+        if d == 'EE' or d == 'EXECUTIVE ENGINEER': return 1
+    if 'AE' in d or 'ASSISTANT' in d: return 4
+    if 'JE' in d or 'JUNIOR' in d: return 5
+    return 6
+
+# --- UNIVERSAL METRICS HELPER ---
+def transferred_first(statuses):
+    """Dedup sort key: 0 for any status mentioning Transferred, 1 otherwise, so a person listed
+    more than once is counted under their Transferred entry."""
+    return map_categories(statuses, lambda s: 0 if 'Transferred' in str(s) else 1)
+
+def calculate_metrics(df):
+    if df.empty: return 0, 0, pd.Series()
+    staff_only = df.loc[df['Staff_Name'].str.contains("VACANT", case=False) == False, ['Staff_Name', 'Status']]
+    staff_only = staff_only.assign(Staff_Name=staff_only['Staff_Name'].str.strip(),
+                                   _rank=transferred_first(staff_only['Status']))
+    staff_only = staff_only.sort_values(by=['Staff_Name', '_rank'], kind='stable')
+    unique_staff = staff_only.drop_duplicates(subset=['Staff_Name'], keep='first')
+    # One count over the deduplicated staff feeds both the Transferred card and the pie
+    status_counts = unique_staff['Status'].value_counts()
+    transferred = int(status_counts.get('Transferred', 0))
+    vacant = int((df['Status'] == 'VACANCY').sum())
+    status_counts = status_counts[status_counts > 0].copy()  # the VACANCY entry is written below
+    if vacant > 0: status_counts['VACANCY'] = vacant
+    return vacant, transferred, status_counts
+
+def grouped_metrics(df, key):
+    """calculate_metrics for every value of key in one pass: Active / Vacant / Transferred counts per group."""
+    status = _as_category(df['Status'], STATUS_ORDER)
+    vacant = (status == 'VACANCY').groupby(df[key], observed=True).sum()
+    named = df['Staff_Name'].str.contains("VACANT", case=False) == False
+    staff = pd.DataFrame({key: df[key], 'Staff_Name': df['Staff_Name'].str.strip(), 'Status': status,
+                          '_rank': transferred_first(df['Status'])})[named]
+    staff = staff.sort_values(by=[key, 'Staff_Name', '_rank'], kind='stable').drop_duplicates(subset=[key, 'Staff_Name'], keep='first')
+    counts = staff.groupby([key, 'Status'], observed=True).size().unstack(fill_value=0)
+    counts = counts.reindex(index=vacant.index, columns=STATUS_ORDER, fill_value=0)
+    return pd.DataFrame({'Active': counts['Active'], 'Vacant': vacant, 'Transferred': counts['Transferred']})
+
+def get_global_metrics(ops_df, dept_df, scope="Global"):
+    dfs = []
+    if not ops_df.empty and scope in ["Global", "Ops"]:
+        clean_ops = ops_df.loc[ops_df['Desk'] != 'Shift In-Charge', ['Staff_Name', 'Status']]
+        dfs.append(clean_ops)
+    if not dept_df.empty:
+        if scope == "Global":
+            dfs.append(dept_df[['Staff_Name', 'Status']])
+        elif scope == "Ops":
+            sic = dept_df[dept_df['Department'].str.contains('Shift In-Charge', na=False)][['Staff_Name', 'Status']]
+            dfs.append(sic)
+        elif scope == "Dept":
+            dfs.append(dept_df[['Staff_Name', 'Status']])
+    if not dfs: return 0, 0, pd.Series()
+    combined = pd.concat(dfs)
+    return calculate_metrics(combined)
+
+def frame_version(df):
+    """Content fingerprint of df, used as the cache key for views derived from it."""
+    if df.empty: return 0
+    return int(pd.util.hash_pandas_object(df, index=True).sum())
+
+@st.cache_data(show_spinner=False)
+def _cached_global_metrics(versions, scope, _ops_df, _dept_df):
+    return get_global_metrics(_ops_df, _dept_df, scope)
+
+def global_metrics(ops_df, dept_df, scope="Global", versions=None):
+    """get_global_metrics, memoised on the content of both frames (pass versions if already known)."""
+    versions = versions or (frame_version(ops_df), frame_version(dept_df))
+    return _cached_global_metrics(versions, scope, ops_df, dept_df)
+
+def ordered_desks(desks):
+    """DESK_ORDER followed by any other desks present, so unknown desks are not dropped.
+    Shift In-Charge is left out: it is reported from the departmental file."""
+    order = pd.Index(DESK_ORDER)
+    extras = pd.Index(np.asarray(desks, dtype=object)).difference(order.append(pd.Index(['Shift In-Charge'])), sort=False)
+    return order.append(extras).tolist()
+
+@st.cache_data(show_spinner=False)
+def dimension_values(version, column, _df):
+    """Distinct values of a column for widget options, computed once per data version."""
+    if _df.empty or column not in _df.columns: return []
+    col = _df[column]
+    if isinstance(col.dtype, pd.CategoricalDtype):
+        return col.cat.remove_unused_categories().cat.categories.tolist()
+    return sorted(col.unique().tolist())
+
+# Row subsets are cached as resources, not data: they are shared without a copy, so never mutate them.
+@st.cache_resource(max_entries=4)
+def roster_rows(version, _df):
+    """Ops rows without Shift In-Charge, which is reported from the departmental file."""
+    return _df[_df['Desk'] != 'Shift In-Charge']
+
+@st.cache_resource(max_entries=4)
+def sic_rows(version, _df):
+    """Shift In-Charge rows of the departmental frame."""
+    if _df.empty: return _df
+    return _df[_df['Department'].str.contains('Shift In-Charge', na=False)]
+
+@st.cache_data(show_spinner=False)
+def row_positions(version, keys, _df):
+    """Maps each value of keys (a column name, or a tuple of them) to the row positions holding it."""
+    if _df.empty: return {}
+    return _df.groupby(list(keys) if isinstance(keys, tuple) else keys, observed=True).indices
+
+@st.cache_data(show_spinner=False)
+def unit_desks(version, _df):
+    """Desks staffed in each unit, in DESK_ORDER (the frame is sorted by Desk), for the dependent Desk selectbox."""
+    if _df.empty: return {}
+    return {unit: list(desks) for unit, desks in _df.groupby('Unit', observed=True)['Desk'].unique().items()}
+
+@st.cache_data(show_spinner=False)
+def unit_gaps(version, _df):
+    """Vacancy and transfer counts per (Unit, Status) for the Gaps by Unit chart."""
+    gaps = _df.loc[_df['Status'].isin(['VACANCY', 'Transferred']), ['Unit', 'Status']]
+    return gaps.groupby(['Unit', 'Status'], observed=True).size().reset_index(name='Count')
+
+@st.cache_data(show_spinner=False)
+def dept_strength(version, _df):
+    """Headcount per department (CHP sections pooled) and the five most common designations."""
+    departments = _df['Department'].map(lambda d: 'Coal Handling Plant' if 'CHP' in d else d)
+    dept_counts = departments.value_counts().reset_index()
+    dept_counts.columns = ['Department', 'Count']
+    return dept_counts, _df['Designation'].value_counts().head(5).reset_index()
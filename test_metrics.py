@@ -0,0 +1,25 @@
+import pandas as pd
+
+from core import calculate_metrics, grouped_metrics
+
+
+def roster():
+    # A is listed as both VACANCY and Transferred; B has a status that only mentions Transferred;
+    # D is a named person whose only row is a VACANCY.
+    return pd.DataFrame({
+        'Staff_Name': ['A', 'A', 'B', 'B', 'C', 'D', 'VACANT'],
+        'Status': ['VACANCY', 'Transferred', 'Active', 'Transferred Out', 'Active', 'VACANCY', 'VACANCY'],
+    })
+
+
+def test_calculate_metrics_keeps_transferred_entry():
+    vacant, transferred, counts = calculate_metrics(roster())
+    assert vacant == 3
+    assert transferred == 1
+    assert counts.to_dict() == {'Transferred': 1, 'Transferred Out': 1, 'Active': 1, 'VACANCY': 3}
+
+
+def test_grouped_metrics_matches_calculate_metrics():
+    df = roster().assign(Unit='Unit 6')
+    row = grouped_metrics(df, 'Unit').loc['Unit 6']
+    assert row.to_dict() == {'Active': 1, 'Vacant': 3, 'Transferred': 1}